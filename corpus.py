@@ -0,0 +1,456 @@
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import heapq
+import bisect
+import struct
+import logging
+import argparse
+import threading
+import contextlib
+import unicodedata
+from array import array
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Packed OCR corpus
+#
+#   text.bin             - UTF-8 OCR text of every page, appended back to back
+#   pages.bin            - one record per page: (offset, length, ac, part, page, source)
+#   sources.txt          - roll PDF names, one per line; a page's source is its line number
+#   ngram_keys.bin       - sorted character trigrams (3 code points packed into 63 bits)
+#   ngram_offsets.bin    - start of each trigram's posting list in ngram_postings.bin
+#   ngram_postings.bin   - sorted page ids containing the trigram
+#   ngram_meta.json      - number of pages covered by the index
+#   lock                 - held exclusively while appending pages or swapping in a new
+#                          index, shared while a search maps the files
+#
+# The text and page table are append-only, so OCR workers can keep adding pages
+# while searches run. Several processes (search.py, d_search.py, corpus.py import)
+# can add pages to the same corpus: each append holds the lock file and re-reads
+# the source table and stored pages first. Pages added after the last index build
+# are scanned directly.
+
+corpus_dir = os.path.join(os.getcwd(), "corpus")
+
+page_record = struct.Struct('<QIIIII')
+posting_record = struct.Struct('<QI')
+gram_size = 3
+# Pages per sorted run while building the index. Sorting a run peaks at about
+# 40 bytes per (trigram, page) entry; at ~1,500 distinct trigrams per roll page
+# that is about 60 MB for 1,000 pages.
+build_batch_pages = 1000
+# Entries read from each run and buffered for the output files during the merge
+merge_write_entries = 1 << 16
+# Packed on-disk layout of a sorted run, same as posting_record
+run_dtype = np.dtype([('key', '<u8'), ('page', '<u4')])
+
+# Characters OCR inserts or drops inconsistently inside Tamil words
+zero_width = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff'))
+
+# Function to normalize OCR text and queries the same way
+def normalize(text):
+    text = unicodedata.normalize('NFC', text).translate(zero_width).lower()
+    return ''.join(text.split())
+
+# Function to get the distinct trigram keys of normalized text
+def ngram_keys(text):
+    codes = [ord(c) for c in text]
+    return {(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - gram_size + 1)}
+
+# Function to check whether pattern occurs in text with at most max_edits edits
+def fuzzy_contains(text, pattern, max_edits):
+    if max_edits == 0:
+        return pattern in text
+    # Sellers' algorithm: edit distance of pattern against any substring of text
+    column = list(range(len(pattern) + 1))
+    for c in text:
+        previous_diagonal, column[0] = column[0], 0
+        for i, p in enumerate(pattern, 1):
+            cost = previous_diagonal if p == c else previous_diagonal + 1
+            previous_diagonal = column[i]
+            column[i] = min(cost, column[i] + 1, column[i - 1] + 1)
+        if column[-1] <= max_edits:
+            return True
+    return False
+
+# Function to get the most edits the trigram index can still filter for a query:
+# at least half of the query's trigrams must survive, or every page becomes a candidate
+def max_edits_for(query):
+    return len(ngram_keys(query)) // (2 * gram_size)
+
+# Function to get the merged (start, end) spans of text around occurrences of the
+# pattern's trigrams. A match with max_edits edits keeps at least one trigram
+# (see max_edits_for) shifted by at most max_edits, so it lies inside a span.
+def gram_windows(text, pattern, max_edits):
+    spans = []
+    for j in range(len(pattern) - gram_size + 1):
+        gram = pattern[j:j + gram_size]
+        position = text.find(gram)
+        while position != -1:
+            start = max(position - j - max_edits, 0)
+            spans.append((start, position - j + len(pattern) + 2 * max_edits))
+            position = text.find(gram, position + 1)
+    spans.sort()
+    windows = []
+    for start, end in spans:
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    return windows
+
+# Function to check a normalized page for the query, verifying edits only around its trigrams
+def page_matches(text, query, max_edits):
+    if query in text:
+        return True
+    if max_edits == 0:
+        return False
+    return any(fuzzy_contains(text[start:end], query, max_edits) for start, end in gram_windows(text, query, max_edits))
+
+# Roll PDF names the AC and part numbers are read from
+pdf_name_patterns = [
+    # elections.tn.gov.in: 3-digit AC then 3-digit part, e.g. "ac184012"
+    re.compile(r'^ac(?P<ac>\d{3})(?P<part>\d{3})$', re.IGNORECASE),
+    # ECI electoral roll service, e.g. "EROLLGEN-S22-184-FinalRoll-Revision2-TAM-12-WI"
+    re.compile(r'^EROLLGEN-S\d+-(?P<ac>\d+)-.*?-(?P<part>\d+)(?:-[A-Za-z]+)*$', re.IGNORECASE),
+]
+
+# Function to get AC and part numbers from a roll PDF name, e.g. "ac184012" -> (184, 12)
+def parse_pdf_name(pdf_name):
+    for pattern in pdf_name_patterns:
+        match = pattern.match(pdf_name)
+        if match:
+            return int(match['ac']), int(match['part'])
+    raise ValueError(f"Unrecognized roll PDF name '{pdf_name}'")
+
+# Function to read the (key, page_id) entries of a sorted run in blocks
+def read_run(run_file):
+    while True:
+        block = run_file.read(posting_record.size * merge_write_entries)
+        if not block:
+            return
+        yield from posting_record.iter_unpack(block)
+
+# Function to hold a lock file across processes, shared or exclusive
+@contextlib.contextmanager
+def file_lock(path, shared=False):
+    with open(path, 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            # msvcrt only has exclusive locks; LK_LOCK gives up after 10 seconds, so retry
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Function to memory-map a file read-only, None when it is missing or empty
+def map_file(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Corpus:
+    def __init__(self, path=corpus_dir):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.lock = threading.Lock()
+        self.text = None
+        self.pages = None
+        self.sources = []
+        self.source_ids = {}
+        self.stored_pages = set()
+        self.stored_records = 0
+        self.keys = None
+        self.offsets = None
+        self.postings = None
+        self.indexed_pages = 0
+        self.refresh()
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    # Map the page table before the text, so every mapped page record points into the mapped text
+    def map_pages(self):
+        self.pages = map_file(self.file('pages.bin'))
+        self.text = map_file(self.file('text.bin'))
+
+    # Re-map the files after pages were appended or the index was rebuilt. The shared
+    # lock keeps a concurrent build_index from swapping index files between the maps.
+    def refresh(self):
+        with self.lock, self.corpus_lock(shared=True):
+            self.map_pages()
+            self.load_sources()
+            keys = map_file(self.file('ngram_keys.bin'))
+            offsets = map_file(self.file('ngram_offsets.bin'))
+            postings = map_file(self.file('ngram_postings.bin'))
+            meta_path = self.file('ngram_meta.json')
+            meta = None
+            if keys and offsets and os.path.exists(meta_path):
+                with open(meta_path) as meta_file:
+                    meta = json.load(meta_file)
+        if meta:
+            self.indexed_pages = meta['pages']
+            self.keys = memoryview(keys).cast('Q')
+            self.offsets = memoryview(offsets).cast('Q')
+            self.postings = memoryview(postings).cast('I') if postings else memoryview(b'').cast('I')
+        else:
+            self.keys = self.offsets = self.postings = None
+            self.indexed_pages = 0
+
+    def corpus_lock(self, shared=False):
+        return file_lock(self.file('lock'), shared)
+
+    # Read the PDF name table, every mapped page record refers to a line already in it.
+    # Called with the lock held.
+    def load_sources(self):
+        path = self.file('sources.txt')
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as sources_file:
+                self.sources = sources_file.read().splitlines()
+        self.source_ids = {name: i for i, name in enumerate(self.sources)}
+
+    # Read the (source, page) pairs of page records appended since the last call,
+    # including those written by other processes. Called with both locks held.
+    def load_stored_pages(self):
+        path = self.file('pages.bin')
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as pages_file:
+            pages_file.seek(self.stored_records * page_record.size)
+            data = pages_file.read()
+        data = data[:len(data) - len(data) % page_record.size]
+        self.stored_pages.update((record[5], record[4]) for record in page_record.iter_unpack(data))
+        self.stored_records += len(data) // page_record.size
+
+    def page_count(self):
+        return len(self.pages) // page_record.size if self.pages else 0
+
+    # Function to append one OCR'd page of a roll PDF, safe to call from several worker threads.
+    # Returns False, without writing anything, when that page of the PDF is already stored.
+    def add_page(self, pdf_name, page, text):
+        data = text.encode('utf-8')
+        with self.lock, self.corpus_lock():
+            # Other processes may have appended sources and pages since this one last wrote
+            self.load_sources()
+            self.load_stored_pages()
+            if (self.source_ids.get(pdf_name), page) in self.stored_pages:
+                return False
+            try:
+                ac, part = parse_pdf_name(pdf_name)
+            except ValueError as e:
+                if pdf_name not in self.source_ids:
+                    logging.warning(f"{e}, its pages are stored as AC 0 part 0")
+                ac, part = 0, 0  # Still searchable, the source name identifies the roll
+            source = self.source_id(pdf_name)
+            with open(self.file('text.bin'), 'ab') as text_file:
+                offset = os.fstat(text_file.fileno()).st_size
+                text_file.write(data)
+            # The page record is written last, so readers never see a page without its text
+            with open(self.file('pages.bin'), 'ab') as pages_file:
+                pages_file.write(page_record.pack(offset, len(data), ac, part, page, source))
+            self.load_stored_pages()
+            self.map_pages()
+            return True
+
+    # Function to get the source number of a PDF name, appending it to the table when new.
+    # Called with both locks held.
+    def source_id(self, pdf_name):
+        if pdf_name not in self.source_ids:
+            with open(self.file('sources.txt'), 'a', encoding="utf-8") as sources_file:
+                sources_file.write(pdf_name + '\n')
+            self.sources.append(pdf_name)
+            self.source_ids[pdf_name] = len(self.sources) - 1
+        return self.source_ids[pdf_name]
+
+    def page_info(self, page_id):
+        offset, length, ac, part, page, source = page_record.unpack_from(self.pages, page_id * page_record.size)
+        return offset, length, (ac, part, page)
+
+    def page_source(self, page_id):
+        source = page_record.unpack_from(self.pages, page_id * page_record.size)[5]
+        return self.sources[source]
+
+    def page_text(self, page_id):
+        offset, length, _ = self.page_info(page_id)
+        return self.text[offset:offset + length].decode('utf-8')
+
+    # Function to build the trigram index over all pages currently in the corpus
+    def build_index(self):
+        self.refresh()
+        total = self.page_count()
+        run_paths = []
+        for start in range(0, total, build_batch_pages):
+            end = min(start + build_batch_pages, total)
+            keys = array('Q')
+            page_ids = array('I')
+            for page_id in range(start, end):
+                page_keys = ngram_keys(normalize(self.page_text(page_id)))
+                keys.extend(page_keys)
+                page_ids.extend([page_id] * len(page_keys))
+            keys = np.frombuffer(keys, dtype=np.uint64)
+            # Page ids are already ascending, a stable sort by key gives (key, page) order
+            order = np.argsort(keys, kind='stable')
+            run = np.empty(len(keys), dtype=run_dtype)
+            run['key'] = keys[order]
+            run['page'] = np.frombuffer(page_ids, dtype=np.uint32)[order]
+            del keys, page_ids, order
+            run_path = self.file(f'ngram_run_{len(run_paths)}.tmp')
+            run.tofile(run_path)
+            del run
+            run_paths.append(run_path)
+            logging.info(f"Indexed pages {start + 1}-{end} of {total}")
+
+        # Merge the sorted runs into keys / offsets / postings
+        runs = [open(p, 'rb') for p in run_paths]
+        with open(self.file('ngram_keys.tmp'), 'wb') as keys_file, \
+                open(self.file('ngram_offsets.tmp'), 'wb') as offsets_file, \
+                open(self.file('ngram_postings.tmp'), 'wb') as postings_file:
+            key_buffer, offset_buffer, posting_buffer = array('Q'), array('Q'), array('I')
+            current_key = None
+            count = 0
+            for key, page_id in heapq.merge(*(read_run(run) for run in runs)):
+                if key != current_key:
+                    key_buffer.append(key)
+                    offset_buffer.append(count)
+                    current_key = key
+                posting_buffer.append(page_id)
+                count += 1
+                if len(posting_buffer) >= merge_write_entries:
+                    for buffer, out in ((key_buffer, keys_file), (offset_buffer, offsets_file), (posting_buffer, postings_file)):
+                        buffer.tofile(out)
+                        del buffer[:]
+            offset_buffer.append(count)
+            key_buffer.tofile(keys_file)
+            offset_buffer.tofile(offsets_file)
+            posting_buffer.tofile(postings_file)
+        for run in runs:
+            run.close()
+        for run_path in run_paths:
+            os.remove(run_path)
+
+        # Drop the old maps before replacing the files underneath them. Searches map the
+        # index under the shared lock, so they see either all old or all new files.
+        self.keys = self.offsets = self.postings = None
+        with self.lock, self.corpus_lock():
+            for name in ('ngram_keys', 'ngram_offsets', 'ngram_postings'):
+                os.replace(self.file(f'{name}.tmp'), self.file(f'{name}.bin'))
+            with open(self.file('ngram_meta.json'), 'w') as meta_file:
+                json.dump({'pages': total}, meta_file)
+        self.refresh()
+        logging.info(f"Index built over {total} pages")
+
+    def posting_list(self, key):
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return self.postings[0:0]
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    # Function to find index candidates that can contain the query with max_edits edits
+    def candidate_pages(self, query, max_edits):
+        grams = ngram_keys(query)
+        # q-gram lemma: each edit destroys at most gram_size trigrams of the query
+        needed = len(grams) - gram_size * max_edits
+        if self.keys is None or needed <= 0:
+            return range(self.indexed_pages)
+        lists = sorted((self.posting_list(key) for key in grams), key=len)
+        # A page holding `needed` of the grams holds at least one of the rarest len - needed + 1
+        seeds = set()
+        for postings in lists[:len(lists) - needed + 1]:
+            seeds.update(postings)
+        candidates = []
+        for page_id in sorted(seeds):
+            hits = 0
+            for postings in lists:
+                i = bisect.bisect_left(postings, page_id)
+                if i < len(postings) and postings[i] == page_id:
+                    hits += 1
+            if hits >= needed:
+                candidates.append(page_id)
+        return candidates
+
+    # Function to search for a name, returns [(ac, part, page, pdf_name), ...]
+    def search(self, name, max_edits=0):
+        self.refresh()
+        query = normalize(name)
+        if not query:
+            return []
+        if max_edits > max_edits_for(query):
+            logging.warning(f"'{name}' is too short for {max_edits} edits, searching with {max_edits_for(query)}")
+            max_edits = max_edits_for(query)
+        page_ids = list(self.candidate_pages(query, max_edits))
+        page_ids.extend(range(self.indexed_pages, self.page_count()))  # Not yet indexed
+        matches = []
+        for page_id in page_ids:
+            if page_matches(normalize(self.page_text(page_id)), query, max_edits):
+                matches.append(self.page_info(page_id)[2] + (self.page_source(page_id),))
+        return matches
+
+    # Function to import the per-page text files written by search.py
+    def import_results(self, results_dir):
+        pattern = re.compile(r'^(?P<pdf>.+?)_[^_]+_page_(?P<page>\d+)_text\.txt$')
+        seen = set()
+        added = 0
+        for f in sorted(os.listdir(results_dir)):
+            match = pattern.match(f)
+            if not match:
+                continue
+            page_key = (match['pdf'], int(match['page']))
+            if page_key in seen:  # One file is written per matching term
+                continue
+            seen.add(page_key)
+            with open(os.path.join(results_dir, f), encoding="utf-8") as text_file:
+                added += self.add_page(match['pdf'], page_key[1], text_file.read())
+        logging.info(f"Imported {added} new pages from {results_dir}, {len(seen) - added} were already in the corpus")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s:%(message)s')
+    parser = argparse.ArgumentParser(description="Packed OCR corpus with a trigram index")
+    parser.add_argument('--corpus', default=corpus_dir)
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="Import per-page text files")
+    import_parser.add_argument('results_dir')
+    commands.add_parser('build', help="Build the trigram index")
+    search_parser = commands.add_parser('search', help="Search for names")
+    search_parser.add_argument('names', nargs='+')
+    search_parser.add_argument('--edits', type=int, default=0, help="Allowed OCR errors per name, capped by name length (about one per 6 characters)")
+    args = parser.parse_args()
+
+    corpus = Corpus(args.corpus)
+    if args.command == 'import':
+        corpus.import_results(args.results_dir)
+    elif args.command == 'build':
+        corpus.build_index()
+    else:
+        for name in args.names:
+            start = time.perf_counter()
+            matches = corpus.search(name, args.edits)
+            elapsed = time.perf_counter() - start
+            print(f"'{name}': {len(matches)} pages in {elapsed:.3f} s")
+            for ac, part, page, pdf_name in matches:
+                print(f"  AC {ac} part {part} page {page} ({pdf_name})")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,9 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
 import pytesseract
+import ocr
+from preprocess import preprocess_page, preprocess_enabled
+from corpus import Corpus
 from pdf2image import convert_from_path
 import fitz  # PyMuPDF
 import time
@@ -48,6 +51,9 @@ urls = [
 # Search terms
 search_terms = ["வன பாரதி ராஜா"]
 
+# Packed OCR text of every processed page, searched with `python corpus.py search`
+roll_corpus = Corpus()
+
 # Function to extract links from a single page
 def extract_links(url):
     driver.get(url)
@@ -94,7 +100,7 @@ def download_pdf(pdf_link):
                 
                 # Open the CAPTCHA image and perform OCR
                 captcha = Image.open(captcha_filename)
-                captcha_text = pytesseract.image_to_string(captcha, lang='tam').strip()
+                captcha_text = ocr.image_to_string(captcha, 'captcha').strip()
                 logging.info(f"Extracted CAPTCHA text: '{captcha_text}'")
 
                 if captcha_text:  # If the CAPTCHA text is not empty, proceed
@@ -134,11 +140,6 @@ def download_pdf(pdf_link):
         logging.error(f"Error processing {pdf_link}: {e}")
         return pdf_link, False
 
-# Function to search for a name in an image
-def search_name_in_image(image, search_name):
-    text = pytesseract.image_to_string(image, lang='tam')  # Use 'tam' for Tamil language
-    return search_name in text, text
-
 # Function to process PDF and search for terms
 def process_pdf(pdf_path, search_terms):
     try:
@@ -147,20 +148,23 @@ def process_pdf(pdf_path, search_terms):
         
         for i, page in enumerate(pages):
             image_path = os.path.join(image_dir, f"{pdf_name}_page_{i + 1}.png")
+            if preprocess_enabled():
+                page = preprocess_page(page)  # Clean 1-bit page for OCR
             page.save(image_path, 'PNG')
 
             # Search for the terms in the current page image
             image = Image.open(image_path)
+            extracted_text = ocr.image_to_string(image, 'roll_page')  # OCR the page once for every term
+            roll_corpus.add_page(pdf_name, i + 1, extracted_text)
             for term in search_terms:
-                found, extracted_text = search_name_in_image(image, term)
-                if found:
+                if term in extracted_text:
                     logging.info(f"Term '{term}' found in {pdf_path} on page {i + 1}")
                     
                     # Save extracted text and cropped image
                     with open(f"{search_results_dir}/{pdf_name}_{term}_page_{i + 1}_text.txt", "w", encoding="utf-8") as text_file:
                         text_file.write(extracted_text)
                     
-                    boxes = pytesseract.image_to_boxes(image, lang='tam')
+                    boxes = ocr.image_to_boxes(image, 'roll_page')
                     for box in boxes.splitlines():
                         b = box.split(' ')
                         if b[0] == term:
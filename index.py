@@ -7,7 +7,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image
-import pytesseract
+import ocr
 import time
 import os
 
@@ -70,7 +70,7 @@ def process_link(pdf_link):
         
         # Open the CAPTCHA image and perform OCR
         captcha = Image.open('captcha.png')
-        captcha_text = pytesseract.image_to_string(captcha)
+        captcha_text = ocr.image_to_string(captcha, 'captcha')
         print("Extracted CAPTCHA text:", captcha_text)
 
         # Enter the CAPTCHA text into the input box
@@ -0,0 +1,155 @@
+import pytesseract
+import os
+import logging
+import threading
+
+# Tessdata directories. The "fast" models are the integer-quantized LSTM models
+# from tesseract-ocr/tessdata_fast; install them next to the regular tessdata, e.g.
+#   /usr/share/tesseract-ocr/4.00/tessdata_fast/tam.traineddata
+# Both are read when OCR runs, so scripts can set TESSDATA_PREFIX after importing this module.
+default_tessdata_dir = "/usr/share/tesseract-ocr/4.00/tessdata/"
+default_tessdata_fast_dir = "/usr/share/tesseract-ocr/4.00/tessdata_fast/"
+
+# Characters that can appear in the download page CAPTCHA
+captcha_whitelist = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+# Named OCR profiles
+#   lang      - tesseract language
+#   psm       - page segmentation mode (3 = automatic, 6 = single block, 7 = single line)
+#   oem       - engine mode (1 = LSTM only)
+#   fast      - use the tessdata_fast models when they are installed
+#   whitelist - restrict recognition to these characters
+profiles = {
+    # Full 300-DPI roll page
+    'roll_page': {'lang': 'tam', 'psm': 3, 'oem': 1, 'fast': True, 'whitelist': None},
+    # Full roll page with the regular (slower, more accurate) models
+    'roll_page_best': {'lang': 'tam', 'psm': 3, 'oem': 1, 'fast': False, 'whitelist': None},
+    # A single voter box cropped from a roll page
+    'voter_cell': {'lang': 'tam', 'psm': 6, 'oem': 1, 'fast': True, 'whitelist': None},
+    # Download page CAPTCHA
+    'captcha': {'lang': 'eng', 'psm': 7, 'oem': 1, 'fast': True, 'whitelist': captcha_whitelist},
+}
+
+_warned_dirs = set()
+
+# Function to pick the tessdata directory for a profile
+def profile_tessdata_dir(profile):
+    tessdata_dir = os.environ.get("TESSDATA_PREFIX", default_tessdata_dir)
+    tessdata_fast_dir = os.environ.get("TESSDATA_FAST_PREFIX", default_tessdata_fast_dir)
+    if profile['fast']:
+        model = os.path.join(tessdata_fast_dir, f"{profile['lang']}.traineddata")
+        if os.path.exists(model):
+            return tessdata_fast_dir
+        if tessdata_fast_dir not in _warned_dirs:
+            _warned_dirs.add(tessdata_fast_dir)
+            logging.warning(f"Fast model {model} not found, falling back to {tessdata_dir}")
+    return tessdata_dir
+
+# Function to build the tesseract command line options for a profile
+def tesseract_config(profile):
+    config = f"--tessdata-dir {profile_tessdata_dir(profile)} --psm {profile['psm']} --oem {profile['oem']}"
+    if profile['whitelist']:
+        config += f" -c tessedit_char_whitelist={profile['whitelist']}"
+    return config
+
+
+# Base class for OCR backends. A backend turns an image into text, and into
+# tesseract box format ("char left bottom right top page" per line, origin at
+# the bottom left), using the settings of a named profile.
+class OCREngine:
+    name = None
+
+    def image_to_string(self, image, profile_name):
+        raise NotImplementedError
+
+    def image_to_boxes(self, image, profile_name):
+        raise NotImplementedError
+
+
+# Default backend: runs the tesseract binary through pytesseract
+class TesseractEngine(OCREngine):
+    name = 'tesseract'
+
+    def image_to_string(self, image, profile_name):
+        profile = profiles[profile_name]
+        return pytesseract.image_to_string(image, lang=profile['lang'], config=tesseract_config(profile))
+
+    def image_to_boxes(self, image, profile_name):
+        profile = profiles[profile_name]
+        return pytesseract.image_to_boxes(image, lang=profile['lang'], config=tesseract_config(profile))
+
+
+# Faster backend: calls libtesseract in-process through tesserocr, so the model
+# is loaded once per thread instead of once per image
+class TesserocrEngine(OCREngine):
+    name = 'tesserocr'
+
+    def __init__(self):
+        import tesserocr  # Optional dependency: pip install tesserocr
+        self.tesserocr = tesserocr
+        self.local = threading.local()
+
+    def get_api(self, profile_name):
+        apis = getattr(self.local, 'apis', None)
+        if apis is None:
+            apis = self.local.apis = {}
+        if profile_name not in apis:
+            profile = profiles[profile_name]
+            api = self.tesserocr.PyTessBaseAPI(
+                path=profile_tessdata_dir(profile),
+                lang=profile['lang'],
+                psm=profile['psm'],
+                oem=profile['oem'],
+            )
+            if profile['whitelist']:
+                api.SetVariable('tessedit_char_whitelist', profile['whitelist'])
+            apis[profile_name] = api
+        return apis[profile_name]
+
+    def image_to_string(self, image, profile_name):
+        api = self.get_api(profile_name)
+        api.SetImage(image)
+        return api.GetUTF8Text()
+
+    def image_to_boxes(self, image, profile_name):
+        api = self.get_api(profile_name)
+        api.SetImage(image)
+        return api.GetBoxText(0)
+
+
+# Registered backends, selected by name with the OCR_ENGINE environment variable
+engines = {
+    TesseractEngine.name: TesseractEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+_engine_instances = {}
+_engine_lock = threading.Lock()
+
+# Function to plug in another CPU OCR backend
+def register_engine(engine_class):
+    engines[engine_class.name] = engine_class
+
+# Function to get a (shared) backend instance
+def get_engine(name=None):
+    name = name or os.environ.get("OCR_ENGINE", TesseractEngine.name)
+    with _engine_lock:
+        if name not in _engine_instances:
+            if name not in engines:
+                raise ValueError(f"Unknown OCR engine '{name}', available: {', '.join(engines)}")
+            _engine_instances[name] = engines[name]()
+        return _engine_instances[name]
+
+# Function to check a profile name before running OCR with it
+def check_profile(profile_name):
+    if profile_name not in profiles:
+        raise ValueError(f"Unknown OCR profile '{profile_name}', available: {', '.join(profiles)}")
+
+# Function to run OCR on an image with a named profile
+def image_to_string(image, profile_name, engine=None):
+    check_profile(profile_name)
+    return get_engine(engine).image_to_string(image, profile_name)
+
+# Function to get character boxes of an image with a named profile, in tesseract box format
+def image_to_boxes(image, profile_name, engine=None):
+    check_profile(profile_name)
+    return get_engine(engine).image_to_boxes(image, profile_name)
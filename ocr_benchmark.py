@@ -0,0 +1,107 @@
+from PIL import Image
+import argparse
+import os
+import time
+import ocr
+from preprocess import preprocess_page
+
+# Compares OCR profiles (and engines) on a sample set. The sample directory holds
+# page images together with a .txt file of the same name listing the names that
+# appear on that page, one per line:
+#   samples/ac184_part1_page_3.png
+#   samples/ac184_part1_page_3.txt
+#
+# Usage:
+#   python ocr_benchmark.py samples --profiles roll_page roll_page_best --target 0.95
+#   python ocr_benchmark.py samples --preprocess both
+
+image_extensions = ('.png', '.jpg', '.jpeg', '.tif', '.tiff')
+
+# Function to load the sample images and their expected names
+def load_samples(sample_dir):
+    samples = []
+    for f in sorted(os.listdir(sample_dir)):
+        if not f.lower().endswith(image_extensions):
+            continue
+        truth_path = os.path.join(sample_dir, os.path.splitext(f)[0] + '.txt')
+        if not os.path.exists(truth_path):
+            continue
+        with open(truth_path, encoding="utf-8") as truth_file:
+            names = [line.strip() for line in truth_file if line.strip()]
+        samples.append((os.path.join(sample_dir, f), names))
+    return samples
+
+# Function to run one untimed OCR call, so backend setup (e.g. loading the
+# tesserocr model) is not charged to the first timed sample
+def warm_up(samples, profile_name, engine=None):
+    image = Image.open(samples[0][0])
+    image.load()
+    ocr.image_to_string(image, profile_name, engine)
+
+# Function to run one profile over all samples and measure speed and name recall
+def benchmark_profile(samples, profile_name, engine=None, preprocess=False):
+    total_time = 0.0
+    preprocess_time = 0.0
+    expected = 0
+    found = 0
+    for image_path, names in samples:
+        image = Image.open(image_path)
+        image.load()
+        if preprocess:
+            start = time.perf_counter()
+            image = preprocess_page(image)
+            preprocess_time += time.perf_counter() - start
+        start = time.perf_counter()
+        text = ocr.image_to_string(image, profile_name, engine)
+        total_time += time.perf_counter() - start
+        expected += len(names)
+        found += sum(1 for name in names if name in text)
+    return {
+        'profile': profile_name,
+        'engine': engine or ocr.get_engine().name,
+        'preprocess': preprocess,
+        'seconds_per_page': total_time / len(samples),
+        'preprocess_seconds_per_page': preprocess_time / len(samples),
+        'recall': found / expected if expected else 1.0,
+    }
+
+# Function to pick the fastest result that still meets the recall target
+def pick_fastest(results, target):
+    passing = [r for r in results if r['recall'] >= target]
+    return min(passing, key=lambda r: r['seconds_per_page'] + r['preprocess_seconds_per_page']) if passing else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR profiles on speed and name recall")
+    parser.add_argument('sample_dir')
+    parser.add_argument('--profiles', nargs='+', default=['roll_page', 'roll_page_best'])
+    parser.add_argument('--engines', nargs='+', default=[ocr.TesseractEngine.name])
+    parser.add_argument('--target', type=float, default=0.95, help="Minimum name recall")
+    parser.add_argument('--preprocess', choices=['off', 'on', 'both'], default='off',
+                        help="Run roll page preprocessing before OCR")
+    args = parser.parse_args()
+
+    samples = load_samples(args.sample_dir)
+    if not samples:
+        raise SystemExit(f"No samples with ground truth found in {args.sample_dir}")
+
+    preprocess_modes = {'off': [False], 'on': [True], 'both': [False, True]}[args.preprocess]
+    results = []
+    for engine in args.engines:
+        for profile_name in args.profiles:
+            warm_up(samples, profile_name, engine)
+            for preprocess in preprocess_modes:
+                result = benchmark_profile(samples, profile_name, engine, preprocess)
+                results.append(result)
+                print(f"{result['engine']:<10} {result['profile']:<16} {'clean' if preprocess else 'raw':<5} "
+                      f"ocr {result['seconds_per_page']:8.3f} s/page  "
+                      f"preprocess {result['preprocess_seconds_per_page']:6.3f} s/page  recall {result['recall']:.3f}")
+
+    best = pick_fastest(results, args.target)
+    if best:
+        print(f"Fastest profile meeting recall {args.target}: {best['engine']} / {best['profile']}"
+              f"{' with preprocessing' if best['preprocess'] else ''}")
+    else:
+        print(f"No profile meets recall {args.target}")
+
+if __name__ == "__main__":
+    main()
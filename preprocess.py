@@ -0,0 +1,91 @@
+from PIL import Image
+import numpy as np
+import os
+
+# Roll page preprocessing: turns a 300-DPI RGB page into a clean 1-bit image
+# before OCR. Every step works on whole NumPy arrays, no per-pixel Python loops.
+
+# Pixels whose RGB channels differ by more than this are coloured (watermark / stamp)
+watermark_saturation = 40
+# Skew angles (degrees) tried when straightening a page
+deskew_angles = np.arange(-2.0, 2.01, 0.25)
+# Shrink factor of the page copy used to estimate skew
+deskew_scale = 4
+# Minimum length of a table line, as a fraction of page width / height
+line_fraction_horizontal = 1 / 8
+line_fraction_vertical = 1 / 20
+
+# Function to check whether the OCR scripts should preprocess rendered pages.
+# Off unless PREPROCESS_PAGES=1; compare recall with `ocr_benchmark.py --preprocess both` first.
+def preprocess_enabled():
+    return os.environ.get("PREPROCESS_PAGES", "0") == "1"
+
+# Function to get the Otsu threshold of a grayscale array
+def otsu_threshold(gray):
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between_variance = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between_variance))
+
+# Function to convert RGB to grayscale, dropping coloured watermarks to white
+def to_grayscale(image):
+    rgb = np.asarray(image.convert('RGB'), dtype=np.int16)
+    saturation = rgb.max(axis=2) - rgb.min(axis=2)
+    gray = (rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114) // 1000
+    gray[saturation > watermark_saturation] = 255
+    return gray.astype(np.uint8)
+
+# Function to mark ink pixels that belong to horizontal runs of at least `length` pixels
+def long_runs(ink, length):
+    rows, cols = ink.shape
+    if length < 1 or length > cols:
+        return np.zeros_like(ink)
+    counts = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.cumsum(ink, axis=1, out=counts[:, 1:])
+    # Windows of `length` pixels that are all ink (erosion) ...
+    full = (counts[:, length:] - counts[:, :-length]) == length
+    starts = np.zeros((rows, full.shape[1] + 1), dtype=np.int32)
+    np.cumsum(full, axis=1, out=starts[:, 1:])
+    # ... spread back over every pixel they cover (dilation)
+    columns = np.arange(cols)
+    last = np.minimum(columns, cols - length) + 1
+    first = np.maximum(columns - length + 1, 0)
+    return (starts[:, last] - starts[:, first]) > 0
+
+# Function to remove table borders and box lines from an ink mask
+def remove_lines(ink):
+    rows, cols = ink.shape
+    horizontal = long_runs(ink, int(cols * line_fraction_horizontal))
+    vertical = long_runs(ink.T, int(rows * line_fraction_vertical)).T
+    return ink & ~(horizontal | vertical)
+
+# Function to estimate page skew (degrees) from horizontal projection profiles
+def estimate_skew(gray):
+    small = Image.fromarray(gray).reduce(deskew_scale)
+    small_gray = np.asarray(small)
+    ink = Image.fromarray(((small_gray < otsu_threshold(small_gray)) * 255).astype(np.uint8))
+    best_angle, best_score = 0.0, -1.0
+    for angle in deskew_angles:
+        rotated = np.asarray(ink.rotate(angle, resample=Image.NEAREST), dtype=np.float64)
+        profile = rotated.sum(axis=1)
+        # Text lines aligned with the rows give the sharpest profile
+        score = np.square(np.diff(profile)).sum()
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+# Function to preprocess a rendered roll page for OCR, returns a mode '1' image
+def preprocess_page(image):
+    gray = to_grayscale(image)
+    angle = estimate_skew(gray)
+    if abs(angle) > 0.1:
+        rotated = Image.fromarray(gray).rotate(angle, resample=Image.BILINEAR, fillcolor=255)
+        gray = np.asarray(rotated)
+    ink = gray < otsu_threshold(gray)
+    ink = remove_lines(ink)
+    return Image.fromarray(~ink)
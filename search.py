@@ -1,4 +1,7 @@
 import pytesseract
+import ocr
+from preprocess import preprocess_page, preprocess_enabled
+from corpus import Corpus
 from PIL import Image
 from pdf2image import convert_from_path
 import os
@@ -23,14 +26,12 @@ os.makedirs(temp_dir, exist_ok=True)
 search_results_dir = os.path.join(os.getcwd(), "results")
 os.makedirs(search_results_dir, exist_ok=True)
 
+# Packed OCR text of every processed page, searched with `python corpus.py search`
+roll_corpus = Corpus()
+
 # Search terms
 search_terms = ["அன்னபூரணி", "அனுஷ்யா"]
 
-# Function to search for a name in an image
-def search_name_in_image(image, search_name):
-    text = pytesseract.image_to_string(image, lang='tam')  # Using Tamil language
-    return search_name in text, text
-
 # Function to process a single PDF file
 def process_pdf(pdf_path):
     try:
@@ -40,12 +41,17 @@ def process_pdf(pdf_path):
         
         for i, page in enumerate(pages):
             image_path = os.path.join(temp_dir, f"{pdf_name}_page_{i + 1}.png")
+            if preprocess_enabled():
+                page = preprocess_page(page)  # Clean 1-bit page for OCR
             page.save(image_path, 'PNG')
             image = Image.open(image_path)
 
+            # OCR the page once, keep the text in the packed corpus for later searches
+            extracted_text = ocr.image_to_string(image, 'roll_page')
+            roll_corpus.add_page(pdf_name, i + 1, extracted_text)
+
             for term in search_terms:
-                found, extracted_text = search_name_in_image(image, term)
-                if found:
+                if term in extracted_text:
                     logging.info(f"Term '{term}' found in {pdf_path} on page {i + 1}")
                     result_file_path = os.path.join(search_results_dir, f"{pdf_name}_{term}_page_{i + 1}_text.txt")
                     with open(result_file_path, "w", encoding="utf-8") as text_file:
@@ -8,6 +8,9 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from PIL import Image, ImageFilter, ImageEnhance
 import pytesseract
+import ocr
+from preprocess import preprocess_page, preprocess_enabled
+from corpus import Corpus
 from pdf2image import convert_from_path
 import fitz  # PyMuPDF
 import time
@@ -50,6 +53,9 @@ urls = [
 # Search terms
 search_terms = ["அன்னபூரணி", "அனுஷ்யா"]
 
+# Packed OCR text of every processed page, searched with `python corpus.py search`
+roll_corpus = Corpus()
+
 # Queue for downloaded PDFs to be processed
 pdf_queue = Queue()
 processed_files = set()
@@ -98,16 +104,16 @@ def clean_captcha_image(image_path):
 # Function to try multiple OCR attempts
 def extract_captcha_text(image):
     # First attempt with default settings
-    text = pytesseract.image_to_string(image).strip()
+    text = ocr.image_to_string(image, 'captcha').strip()
     
     if len(text) < 6:  # If text is too short, try different preprocessing steps
         # Second attempt with thresholding
         image = image.point(lambda p: p > 128 and 255)
-        text = pytesseract.image_to_string(image).strip()
+        text = ocr.image_to_string(image, 'captcha').strip()
     
     if len(text) < 6:  # If text is still too short, try sharpening
         image = image.filter(ImageFilter.SHARPEN)
-        text = pytesseract.image_to_string(image).strip()
+        text = ocr.image_to_string(image, 'captcha').strip()
     
     return text
 
@@ -191,11 +197,6 @@ def download_pdf(pdf_link):
         failed_urls.append(pdf_link)
         return pdf_link, False
 
-# Function to search for a name in an image
-def search_name_in_image(image, search_name):
-    text = pytesseract.image_to_string(image, lang='tam')  # Use 'tam' for Tamil language
-    return search_name in text, text
-
 # Function to process PDF and search for terms
 def process_pdf():
     global search_found_count
@@ -211,20 +212,23 @@ def process_pdf():
                 
                 for i, page in enumerate(pages):
                     image_path = os.path.join(image_dir, f"{pdf_name}_page_{i + 1}.png")
+                    if preprocess_enabled():
+                        page = preprocess_page(page)  # Clean 1-bit page for OCR
                     page.save(image_path, 'PNG')
 
                     # Search for the terms in the current page image
                     image = Image.open(image_path)
+                    extracted_text = ocr.image_to_string(image, 'roll_page')  # OCR the page once for every term
+                    roll_corpus.add_page(pdf_name, i + 1, extracted_text)
                     for term in search_terms:
-                        found, extracted_text = search_name_in_image(image, term)
-                        if found:
+                        if term in extracted_text:
                             logging.info(f"Term '{term}' found in {pdf_path} on page {i + 1}")
                             
                             # Save extracted text and cropped image
                             with open(f"{search_results_dir}/{pdf_name}_{term}_page_{i + 1}_text.txt", "w", encoding="utf-8") as text_file:
                                 text_file.write(extracted_text)
                             
-                            boxes = pytesseract.image_to_boxes(image, lang='tam')
+                            boxes = ocr.image_to_boxes(image, 'roll_page')
                             for box in boxes.splitlines():
                                 b = box.split(' ')
                                 if b[0] == term: